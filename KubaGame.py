@@ -1,58 +1,205 @@
 # Author: Xiuzhu Shao
 # Date: 05/23/2021
 # Description: This project is an implementation to play the board game Kuba. It consists of a KubaPlayer class that
-# represents the player's name, player's color ('W' or 'B'), number of red marbles captured by the player, and number
-# of opponent's marbles captured by the player. It also contains the KubaGame class. This class stores the state of the
-# board, contains methods for moving pieces left,right,forward, and backwards, and also tracks the current turn and the
-# winner of the game. The rules for Kuba can be found here:
+# is a snapshot of the player's name, player's color ('W' or 'B'), number of red marbles captured by the player, and
+# number of opponent's marbles captured by the player. It also contains the KubaGame class. This class stores the
+# state of the board and of both players, contains methods for moving pieces left,right,forward, and backwards, and
+# also tracks the current turn and the winner of the game. The rules for Kuba can be found here:
 # https://sites.google.com/site/boardandpieces/list-of-games/kuba
 
-import copy
-
-class KubaPlayer:
+from collections import deque, namedtuple
+
+# Marbles are stored as small integer codes. A code is
+# also the index of the marble's character in MARBLE_CHARS.
+X, W, B, R = 0, 1, 2, 3
+MARBLE_CHARS = "XWBR"
+
+# The colors a player may choose, and their marble codes.
+PLAYER_COLORS = {'W': W, 'B': B}
+
+# Starting layout of the board, one tuple of marble codes
+# per row. The board itself is stored as one 49 bit integer (bitboard)
+# per marble code, where cell (row, column) is bit
+# row * 7 + column. The bitboard for X holds the blank
+# cells.
+START_BOARD = (
+    (W, W, X, X, X, B, B),
+    (W, W, X, R, X, B, B),
+    (X, X, R, R, R, X, W),
+    (X, R, R, R, R, R, X),
+    (X, X, R, R, R, X, X),
+    (B, B, X, R, X, W, W),
+    (B, B, X, X, X, W, W),
+)
+
+# The whole board is also kept as one immutable integer, the
+# position, which is compared to find a move that reverts the
+# opponent's last move. It holds the W, B, and R bitboards
+# side by side, each PLANE bits apart. A plane is 7 bits wider
+# than the board, so a marble pushed past the last row lands
+# in the unused bits instead of in the next bitboard.
+# Multiplying a bitboard by SPREAD copies it into all three
+# planes.
+PLANE = 56
+SPREAD = 1 | 1 << PLANE | 1 << 2 * PLANE
+
+
+def make_rays(row_step, column_step):
+    """
+    Takes in the row and column step of a direction
+    and returns a list of 49 bitboards, one per cell
+    (indexed by row * 7 + column). Each bitboard holds
+    the cells from the neighbor of that cell in the
+    given direction up to the edge of the board.
+    """
+    rays = []
+    for row in range(7):
+        for column in range(7):
+            ray = 0
+            next_row = row + row_step
+            next_column = column + column_step
+            while 0 <= next_row <= 6 and 0 <= next_column <= 6:
+                ray |= 1 << (next_row * 7 + next_column)
+                next_row += row_step
+                next_column += column_step
+            rays.append(ray)
+    return rays
+
+
+def make_lines(rays, toward_lower):
+    """
+    Takes in the rays of a direction and whether that
+    direction moves marbles towards lower bits, and
+    returns a list of 49 dictionaries, one per cell.
+    Each dictionary maps every possible set of blank
+    cells in that cell's ray to the line of cells a
+    push from the cell moves: from the cell up to the
+    nearest blank cell, or up to the edge if the ray
+    has no blank cell.
+    """
+    lines = []
+    for cell in range(49):
+        ray = rays[cell]
+        cell_lines = {}
+        # Steps through every subset of the ray, starting
+        # and ending with the empty set.
+        blanks = 0
+        while True:
+            if blanks:
+                # The line ends at the nearest blank cell,
+                # the blank bit closest to the cell.
+                if toward_lower:
+                    end = blanks.bit_length() - 1
+                else:
+                    end = (blanks & -blanks).bit_length() - 1
+            elif ray:
+                # The line runs to the edge, the bit of the
+                # ray farthest from the cell.
+                if toward_lower:
+                    end = (ray & -ray).bit_length() - 1
+                else:
+                    end = ray.bit_length() - 1
+            else:
+                # The cell is itself on the edge.
+                end = cell
+            cell_lines[blanks] = (ray ^ rays[end]) | (1 << cell)
+            blanks = (blanks - ray) & ray
+            if not blanks:
+                break
+        lines.append(cell_lines)
+    return lines
+
+
+# Cells to the left of, right of, above (forward), and
+# below (backward) each cell, computed once at import.
+LEFT_RAY = make_rays(0, -1)
+RIGHT_RAY = make_rays(0, 1)
+UP_RAY = make_rays(-1, 0)
+DOWN_RAY = make_rays(1, 0)
+
+# The cell directly to the left of, right of, above, and
+# below each cell, as a one bit bitboard, or 0 if the cell
+# is on that edge. This is the nearest cell of each ray.
+LEFT_NEIGHBOR = [1 << (ray.bit_length() - 1) if ray else 0 for ray in LEFT_RAY]
+RIGHT_NEIGHBOR = [ray & -ray for ray in RIGHT_RAY]
+UP_NEIGHBOR = [1 << (ray.bit_length() - 1) if ray else 0 for ray in UP_RAY]
+DOWN_NEIGHBOR = [ray & -ray for ray in DOWN_RAY]
+
+# The cell at the left, right, top (forward), and bottom
+# (backward) end of each cell's row or column.
+LEFT_EDGE = [cell - cell % 7 for cell in range(49)]
+RIGHT_EDGE = [cell - cell % 7 + 6 for cell in range(49)]
+TOP_EDGE = [cell % 7 for cell in range(49)]
+BOTTOM_EDGE = [42 + cell % 7 for cell in range(49)]
+
+# Everything checking a push needs to know about each
+# direction: the ray of cells in front of the marble, the
+# cell behind it, the edge cell in front of it, and the
+# line pushed for each set of blank cells in the ray.
+DIRECTIONS = {
+    'L': (LEFT_RAY, RIGHT_NEIGHBOR, LEFT_EDGE, make_lines(LEFT_RAY, True)),
+    'R': (RIGHT_RAY, LEFT_NEIGHBOR, RIGHT_EDGE, make_lines(RIGHT_RAY, False)),
+    'F': (UP_RAY, DOWN_NEIGHBOR, TOP_EDGE, make_lines(UP_RAY, True)),
+    'B': (DOWN_RAY, UP_NEIGHBOR, BOTTOM_EDGE, make_lines(DOWN_RAY, False)),
+}
+
+# The number of bits each marble moves towards higher or
+# lower bits when pushed in each direction.
+SHIFTS = {
+    'L': (0, 1),
+    'R': (1, 0),
+    'F': (0, 7),
+    'B': (7, 0),
+}
+
+# The cells in the leftmost and rightmost columns, and the
+# cells on the edge of the board.
+LEFT_COLUMN = sum(1 << cell for cell in range(0, 49, 7))
+RIGHT_COLUMN = LEFT_COLUMN << 6
+BORDER = sum(1 << cell for cell in range(49)
+             if cell // 7 in (0, 6) or cell % 7 in (0, 6))
+
+# Every cell in the same row or column as each cell,
+# including the cell itself.
+CROSS = [LEFT_RAY[cell] | RIGHT_RAY[cell] | UP_RAY[cell] | DOWN_RAY[cell] | 1 << cell
+         for cell in range(49)]
+
+
+class KubaPlayer(namedtuple('KubaPlayer', ['name', 'color', 'red', 'opponent_marbles'],
+                            defaults=(0, 0))):
     """
     Represents a Kuba player. This class
     holds the player's name, the player's
     color, the number of red marbles captured
     by the player, and the number of opponent's
-    marbles captured by the player.
+    marbles captured by the player. The two
+    counts default to 0.
 
-    The class contains get methods for each
-    of these data members as well as methods
-    for incrementing the number of red marbles
-    and opponent's marbles in the player's inventory.
+    The game keeps these counts itself, so a
+    KubaPlayer is a read-only snapshot returned
+    by KubaGame.get_player. The class contains
+    get methods for each of these data members.
     """
-    def __init__(self, name, color):
-        """
-        Initializes player object with the
-        following attributes:
-        name, color, # of red marbles in
-        inventory, # of opponent's marbles
-        in inventory.
-        """
-        self._name = name
-        self._color = color
-        self._red = 0
-        self._opponent_marbles = 0
+    __slots__ = ()
 
     def get_name(self):
         """
         Returns the player's name.
         """
-        return self._name
+        return self.name
 
     def get_color(self):
         """
         Returns the player's color.
         """
-        return self._color
+        return self.color
 
     def get_red(self):
         """
         Returns number of red marbles
         captured by the player.
         """
-        return self._red
+        return self.red
 
     def get_opponent_marbles(self):
         """
@@ -60,77 +207,95 @@ class KubaPlayer:
         of the opponent's color
         that the player has captured.
         """
-        return self._opponent_marbles
-
-    def add_red(self):
-        """
-        Adds a red marble to
-        player's inventory.
-        """
-        self._red += 1
-
-    def add_opponent_marbles(self):
-        """
-        Adds a marble of the opponent's
-        color to the player's inventory.
-        """
-        self._opponent_marbles += 1
+        return self.opponent_marbles
 
 
 class KubaGame:
     """
     Represents a game of Kuba. This class will
-    initialize two KubaPlayer objects in a list,
-    as well as the game board. The class contains
+    initialize the names, colors and captured
+    marble counts of both players, as well as the
+    game board. The class contains
     methods for pushing a marble either left, right,
     forwards, or backwards. The class also tracks
     which player's turn it is to play, the winner,
     the number of red, white, and black marbles on
-    the board, as well as the no-go move for the
-    next turn.
+    the board, as well as the position of the board
+    before the last move, which the next move may
+    not recreate.
     """
+    # A game has a fixed set of data members, so they are
+    # declared as slots instead of kept in a per-instance dict.
+    __slots__ = ('_names', '_name_to_index', '_colors', '_red_captured',
+                 '_opp_captured', '_winner', '_turn', '_bits', '_red',
+                 '_white', '_black', '_position', '_history', '_legal_dirs',
+                 '_legal_count', '_captured_marble')
+
     def __init__(self, pc_tup_1, pc_tup_2):
         """
         Initializes a game object consisting of
-        several data members: players list consisting
-        of two KubaPlayer objects; the winner and name of
-        the player whose turn it is, both initialized
-        to None; the board with 13 red marbles, 8 white
-        marbles, and 8 black marbles; the no-go
-        move (representing the move which would reverse
-        the board condition to the previous state left
-        by the opponent), also initialized to None; the
-        current marble that is captured by the current player
-        (stored as a string, initialized to none), and a
-        temporary board temp_board, also initialized to
-        None.
-        """
-        self._players = [KubaPlayer(pc_tup_1[0], pc_tup_1[1]),
-                         KubaPlayer(pc_tup_2[0], pc_tup_2[1])]
+        several data members: the names and marble
+        codes of the two players, stored as tuples in
+        the order the players were given, and the number
+        of red and opponent's marbles each player has
+        captured, stored as lists in the same order and
+        initialized to 0; a dictionary from each
+        player's name to the player's index in those
+        tuples and lists; the winner and name of the
+        player whose turn it is, both initialized to
+        None; the board with 13 red marbles, 8 white
+        marbles, and 8 black marbles, stored as a list
+        of bitboards indexed by marble code (the X
+        bitboard holds the blank cells); the position of
+        the board, all of its bitboards packed into one
+        integer; a history of the positions after the
+        last two moves, the older of which is the
+        position before the last move (a move that
+        recreates it would reverse the opponent's last
+        move), initialized to None and the starting
+        position; the number of legal pushes of each
+        marble and the total for each player's marble
+        code, counted from the starting board and kept
+        up to date after every move; and the current
+        marble that is captured by the current player
+        (stored as a marble code, initialized to none).
+        """
+        self._names = (pc_tup_1[0], pc_tup_2[0])
+        # The second player is listed first so that, if both
+        # players share a name, the name maps to the first one.
+        self._name_to_index = {pc_tup_2[0]: 1, pc_tup_1[0]: 0}
+        for pc_tup in (pc_tup_1, pc_tup_2):
+            if pc_tup[1] not in PLAYER_COLORS:
+                raise ValueError("Player color must be 'W' or 'B', not %r" % (pc_tup[1],))
+        self._colors = (PLAYER_COLORS[pc_tup_1[1]], PLAYER_COLORS[pc_tup_2[1]])
+        self._red_captured = [0, 0]
+        self._opp_captured = [0, 0]
         self._winner = None
         self._turn = None
-        self._board = [
-            [ "W", "W", "X", "X", "X", "B", "B" ],
-            [ "W", "W", "X", "R", "X", "B", "B" ],
-            [ "X", "X", "R", "R", "R", "X", "W" ],
-            [ "X", "R", "R", "R", "R", "R", "X" ],
-            [ "X", "X", "R", "R", "R", "X", "X" ],
-            [ "B", "B", "X", "R", "X", "W", "W" ],
-            [ "B", "B", "X", "X", "X", "W", "W" ],
-        ]
+        self._bits = [0, 0, 0, 0]
+        for row in range(7):
+            for column in range(7):
+                self._bits[START_BOARD[row][column]] |= 1 << (row * 7 + column)
         self._red = 13
         self._white = 8
         self._black = 8
-        self._no_go_move = None
+        self._position = (self._bits[W] | self._bits[B] << PLANE
+                          | self._bits[R] << 2 * PLANE)
+        # The positions after the last two moves, oldest
+        # first. Only the position before the opponent's last
+        # move is ever compared, so two are kept.
+        self._history = deque((None, self._position), maxlen=2)
+        self._legal_dirs = [0] * 49
+        self._legal_count = [0, 0, 0, 0]
+        self._count_legal((1 << 49) - 1)
         self._captured_marble = None
-        self._temp_board = None
 
     def print_board(self):
         """
         Prints the entire board.
         """
-        for row in self._board:
-            print(row)
+        for row in range(7):
+            print([self.get_marble((row, column)) for column in range(7)])
 
     def get_current_turn(self):
         """
@@ -169,70 +334,42 @@ class KubaGame:
             if num < 0 or num > 6:
                 return False
 
-        # Retrieves current player object from player
-        # list. Stores an integer 0 if the current
-        # player is the first object in the list, and
-        # a 1 otherwise.
-        if self._players[0].get_name() == playername:
-            current_player = self._players[0]
-            other_player = self._players[1]
-            curr = 0
-        elif self._players[1].get_name() == playername:
-            current_player = self._players[1]
-            other_player = self._players[0]
-            curr = 1
-        else:
+        # Finds the index of the current player. Stores an
+        # integer 0 if the current player is the first player,
+        # and a 1 otherwise.
+        curr = self._name_to_index.get(playername)
+        if curr is None:
             return False    # Invalid playername
 
         # If marble being moved is not player's marble, or if
         # space is empty:
-        if self.get_marble(coordinates) != current_player.get_color():
+        color = self._colors[curr]
+        if self._color_at(coordinates[0] * 7 + coordinates[1]) != color:
             return False
 
         # Confirms whether or not there are legal moves left for
         # the current player. If no moves are left, winner becomes
         # other player's name and move returns False.
-        temp_no_go = self._no_go_move   # saves a copy of no-go move
-        can_move = False
-        for row in range(7):
-            for column in range(7):
-                cell = self._board[row][column]
-                if cell == current_player.get_color():
-                    test_left = self.move_left((row,column),current_player)
-                    test_right = self.move_right((row,column),current_player)
-                    test_forward = self.move_forward((row, column), current_player)
-                    test_backward = self.move_backward((row, column), current_player)
-                    if test_left or test_right or test_forward or test_backward:
-                        # If a move is possible in any direction, loop terminates
-                        can_move = True
-                        break
-        self._no_go_move = temp_no_go   # restores no-go move
+        can_move = self._can_move(color)
         # No legal moves are possible for current player, set winner equal
         # to opponent's name.
         if not can_move:
-            self._winner = other_player.get_name()
+            self._winner = self._names[1 - curr]
             return False
 
-        # Attempts to move marble in direction specified. If
+        # Attempts to move marble in direction specified. The
+        # board is only updated if the move succeeds. If
         # movement fails due to pushing own marble off of edge
         # or if there is no space for movement, return False.
         # If move undoes last move by opponent, return False
         # Else, updates board and player/board marble counts.
-        if direction == 'L':
-            temp = self.move_left(coordinates,current_player)
-        elif direction == 'R':
-            temp = self.move_right(coordinates,current_player)
-        elif direction == 'F':
-            temp = self.move_forward(coordinates,current_player)
-        elif direction == 'B':
-            temp = self.move_backward(coordinates,current_player)
-        else:   #Direction instruction is invalid
+        if direction not in DIRECTIONS:   #Direction instruction is invalid
             return False
+        temp = self._push(coordinates, color, direction)
 
         if temp:    # If the move is successful.
             if self._captured_marble is not None:   # A marble has been captured
-                self.update_marbles(self._captured_marble, current_player)
-            self._board = self._temp_board  # Move is real, update real board state.
+                self.update_marbles(self._captured_marble, curr)
         if not temp:    # If the move is not successful.
             return False
 
@@ -244,349 +381,309 @@ class KubaGame:
         # captured by the current player. If the player has captured
         # at least 7 red stones or all 8 of the opponent's marbles,
         # the current player's name is stored as the winner.
-        opponent_marbles = current_player.get_opponent_marbles()
-        player_red = current_player.get_red()
+        opponent_marbles = self._opp_captured[curr]
+        player_red = self._red_captured[curr]
         if opponent_marbles >= 8 or player_red >= 7:
             self._winner = playername
 
-        # Updates the turn. If current player is first player in
-        # the player list, sets turn to be other player's name, and
+        # Updates the turn. If current player is the first
+        # player, sets turn to be other player's name, and
         # vice versa.
         if curr == 0:
-            self._turn = self._players[1].get_name()
+            self._turn = self._names[1]
         else:
-            self._turn = self._players[0].get_name()
+            self._turn = self._names[0]
 
         return True
 
     def move_left(self, coor_tup, player):
         """
-        Takes in coordinates as a tuple and
-        current player object. Makes a temporary
-        board that is a copy of self._board, and
-        pushes marble at coordinate left on the
-        temporary board. If a marble will be pushed
-         off of the edge, save its color under the
-         _captured_marble data member. Returns
-        False if player will push own marble off of board,
-        move is impossible, or move results in duplicating
-        board state created by opponent last round.
-        Updates the no-go move, if applicable, and
-        returns True.
-        """
-        # Makes a copy of the board
-        self._temp_board = copy.deepcopy(self._board)
-        self._captured_marble = None    # Assume no marble is captured to begin
-        row = coor_tup[0]
-        column = coor_tup[1]
-        min = 0
-        # Inverse bool tracks if a no-go move will
-        # need to be created at the end of the move.
-        inverse_bool = True
-
-        # If cell to be moved is not at the right edge and
-        # value to right of cell is not blank, move is
-        # impossible and method returns False.
-        if column != 6:
-            val = self._temp_board[row][column + 1]
-            if val != 'X':
-                return False
-
-        # Finds next blank cell in row to the left (if it exists).
-        for num in range(column,-1,-1):
-            if self._temp_board[row][num] == 'X':
-                min = num
-                break
-
-        # If blank cell exists to the left, no-go move will
-        # not be needed.
-        if min != 0:
-            inverse_bool = False
-
-        # Piece will be pushed off of edge of board
-        if min == 0:
-            leftmost = self._temp_board[row][min]
-            if leftmost == player.get_color():  # If player is about to push
-                # own marble off of edge, return False
-                return False
-            elif leftmost != 'X':
-                # If marbles is pushed off of board, no-go
-                # move will not be needed.
-                inverse_bool = False
-                self._captured_marble = leftmost
-
-        # If move undoes opponent's previous, return False
-        if self._no_go_move is not None \
-                and coor_tup[0] == self._no_go_move[0] \
-                and coor_tup[1] == self._no_go_move[1] \
-                and self._no_go_move[2] == 'L':
-            return False
-
-        # Move is successful. Updates board,updates
-        # no_go_move, and returns True
-        for num in range(min,column):
-            self._temp_board[row][num] = self._temp_board[row][num+1]
-        self._temp_board[row][column] = 'X'
-
-        # Updates no-go move to be the inverse
-        # of move that was just performed. Clears out
-        # current no-go move if no inverse move is
-        # required.
-        if inverse_bool is True:
-            self._no_go_move = (row,min,'R')
-        else:
-            self._no_go_move = None
-
-        return True
+        Takes in coordinates as a tuple and the
+        current player as a KubaPlayer, and makes
+        the move pushing marble at coordinate left.
+        See make_move.
+        """
+        return self.make_move(player.get_name(), coor_tup, 'L')
 
     def move_right(self, coor_tup, player):
         """
-        Takes in coordinates as a tuple and
-        current player object. Makes a temporary
-        board that is a copy of self._board, and
-        pushes marble at coordinate right on the
-        temporary board. If a marble will be pushed
-         off of the edge, save its color under the
-         _captured_marble data member. Returns
-        False if player will push own marble off of board,
-        move is impossible, or move results in duplicating
-        board state created by opponent last round.
-        Updates the no-go move, if applicable, and
-        returns True.
+        Takes in coordinates as a tuple and the
+        current player as a KubaPlayer, and makes
+        the move pushing marble at coordinate right.
+        See make_move.
         """
-        # Makes a copy of the board
-        self._temp_board = copy.deepcopy(self._board)
-        self._captured_marble = None  # Assume no marble is captured to begin
-        row = coor_tup[0]
-        column = coor_tup[1]
-        max = 6
-        # Inverse bool tracks if a no-go move will
-        # need to be created at the end of the move.
-        inverse_bool = True
-
-        # If cell to be moved is not at the left edge and
-        # value to left of cell is not blank, move is
-        # impossible and method returns False.
-        if column != 0:
-            val = self._temp_board[row][column - 1]
-            if val != 'X':
-                return False
-
-        # Finds next blank cell in row to the right (if it exists).
-        for num in range(column,7):
-            if self._temp_board[row][num] == 'X':
-                max = num
-                break
-
-        # If blank cell exists to the right, no-go move will
-        # not be needed.
-        if max != 6:
-            inverse_bool = False
-
-        # Piece will be pushed off of edge of board
-        if max == 6:
-            rightmost = self._temp_board[row][max]
-            if rightmost == player.get_color():  # If player is about to push
-                # own marble off of edge, return False
-                return False
-            elif rightmost != 'X':
-                # If marbles is pushed off of board, no-go
-                # move will not be needed.
-                inverse_bool = False
-                self._captured_marble = rightmost
-
-        # If move undoes opponent's previous, return False
-        if self._no_go_move is not None \
-                and coor_tup[0] == self._no_go_move[0] \
-                and coor_tup[1] == self._no_go_move[1] \
-                and self._no_go_move[2] == 'R':
-            return False
-
-        # Move is successful. Updates board and returns True
-        for num in range(max,column,-1):
-            self._temp_board[row][num] = self._temp_board[row][num - 1]
-        self._temp_board[row][column] = 'X'
-
-        # Updates no-go move to be the inverse
-        # of move that was just performed. Clears out
-        # current no-go move if no inverse move is
-        # required.
-        if inverse_bool is True:
-            self._no_go_move = (row,max,'L')
-        else:
-            self._no_go_move = None
-
-        return True
+        return self.make_move(player.get_name(), coor_tup, 'R')
 
     def move_forward(self, coor_tup, player):
         """
-        Takes in coordinates as a tuple and
-        current player object. Makes a temporary
-        board that is a copy of self._board, and
-        pushes marble at coordinate forward on the
-        temporary board. If a marble will be pushed
-         off of the edge, save its color under the
-         _captured_marble data member. Returns
-        False if player will push own marble off of board,
-        move is impossible, or move results in duplicating
-        board state created by opponent last round.
-        Updates the no-go move, if applicable, and
-        returns True.
+        Takes in coordinates as a tuple and the
+        current player as a KubaPlayer, and makes
+        the move pushing marble at coordinate forward.
+        See make_move.
         """
-        # Makes a copy of the board
-        self._temp_board = copy.deepcopy(self._board)
-        self._captured_marble = None  # Assume no marble is captured to begin
-        row = coor_tup[0]
-        column = coor_tup[1]
-        min = 0
-        # Inverse bool tracks if a no-go move will
-        # need to be created at the end of the move.
-        inverse_bool = True
-
-        # If cell to be moved is not at the bottom edge and
-        # value in cell below is not blank, move is
-        # impossible and method returns False.
-        if row != 6:
-            val = self._temp_board[row + 1][column]
-            if val != 'X':
-                return False
-
-        # Finds next blank cell above in column (if it exists).
-        for num in range(row,-1,-1):
-            if self._temp_board[num][column] == 'X':
-                min = num
-                break
-
-        # If blank cell exists above, no-go move will
-        # not be needed.
-        if min != 0:
-            inverse_bool = False
-
-        # Piece will be pushed off of edge of board
-        if min == 0:
-            topmost = self._temp_board[min][column]
-            if topmost == player.get_color():  # If player is about to push
-                # own marble off of edge, return False
-                return False
-            elif topmost != 'X':
-                # If marbles is pushed off of board, no-go
-                # move will not be needed.
-                inverse_bool = False
-                self._captured_marble = topmost
-
-        # If move undoes opponent's previous, return False
-        if self._no_go_move is not None \
-                and coor_tup[0] == self._no_go_move[0] \
-                and coor_tup[1] == self._no_go_move[1] \
-                and self._no_go_move[2] == 'F':
-            return False
-
-        # Move is successful. Updates board and returns True
-        for num in range(min,row):
-            self._temp_board[num][column] = self._temp_board[num+1][column]
-        self._temp_board[row][column] = 'X'
-
-        # Updates no-go move to be the inverse
-        # of move that was just performed. Clears out
-        # current no-go move if no inverse move is
-        # required.
-        if inverse_bool is True:
-            self._no_go_move = (min,column,'B')
-        else:
-            self._no_go_move = None
-
-        return True
+        return self.make_move(player.get_name(), coor_tup, 'F')
 
     def move_backward(self, coor_tup, player):
         """
-        Takes in coordinates as a tuple and
-        current player object. Makes a temporary
-        board that is a copy of self._board, and
-        pushes marble at coordinate backward on the
-        temporary board. If a marble will be pushed
-         off of the edge, save its color under the
-         _captured_marble data member. Returns
-        False if player will push own marble off of board,
-        move is impossible, or move results in duplicating
+        Takes in coordinates as a tuple and the
+        current player as a KubaPlayer, and makes
+        the move pushing marble at coordinate backward.
+        See make_move.
+        """
+        return self.make_move(player.get_name(), coor_tup, 'B')
+
+    def _push(self, coor_tup, color, direction):
+        """
+        The board step of make_move, which has already
+        checked the turn, the marble's owner, and that
+        the game is not over; make_move also updates the
+        marble counts and turn afterwards. Takes in
+        coordinates as a tuple, the current player's
+        marble code, and a direction, 'L', 'R', 'F', or
+        'B', and pushes marble at coordinate in that
+        direction on the board. If a marble will be
+        pushed off of the edge, save its code under the
+        _captured_marble data member. Returns False if
+        player will push own marble off of board, move
+        is impossible, or move results in duplicating
         board state created by opponent last round.
-        Updates the no-go move, if applicable, and
-        returns True.
+        Adds the new position to the history and returns
+        True.
         """
-        # Makes a copy of the board
-        self._temp_board = copy.deepcopy(self._board)
-        self._captured_marble = None  # Assume no marble is captured to begin
-        row = coor_tup[0]
-        column = coor_tup[1]
-        max = 6
-        # Inverse bool tracks if a no-go move will
-        # need to be created at the end of the move.
-        inverse_bool = True
-
-        # If cell to be moved is not at the top edge and
-        # value in cell above is not blank, move is
-        # impossible and method returns False.
-        if row != 0:
-            val = self._temp_board[row - 1][column]
-            if val != 'X':
-                return False
-
-        # Finds next blank cell below in column (if it exists).
-        for num in range(row,7):
-            if self._temp_board[num][column] == 'X':
-                max = num
-                break
-
-        # If blank cell exists below, no-go move will
-        # not be needed.
-        if max != 6:
-            inverse_bool = False
-
-        # Piece will be pushed off of edge of board
-        if max == 6:
-            bottommost = self._temp_board[max][column]
-            if bottommost == player.get_color():  # If player is about to push
-                # own marble off of edge, return False
-                return False
-            elif bottommost != 'X':
-                # If marbles is pushed off of board, no-go
-                # move will not be needed.
-                inverse_bool = False
-                self._captured_marble = bottommost
-
-        # If move undoes opponent's previous, return False
-        if self._no_go_move is not None \
-                and coor_tup[0] == self._no_go_move[0] \
-                and coor_tup[1] == self._no_go_move[1] \
-                and self._no_go_move[2] == 'B':
+        cell = coor_tup[0] * 7 + coor_tup[1]
+        line = self._check_push(cell, color, direction)
+        if not line or self._reverts(line, direction):
             return False
+        self._apply_push(line, direction)
+        return True
 
-        # Move is successful. Updates board and returns True
-        for num in range(max,row,-1):
-            self._temp_board[num][column] = self._temp_board[num-1][column]
-        self._temp_board[row][column] = 'X'
-
-        # Updates no-go move to be the inverse
-        # of move that was just performed. Clears out
-        # current no-go move if no inverse move is
-        # required.
-        if inverse_bool is True:
-            self._no_go_move = (max,column,'F')
+    def _check_push(self, cell, color, direction):
+        """
+        Takes in the bit number of a marble's cell,
+        the marble code of the player pushing it, and
+        a direction. If the marble can be pushed in that
+        direction, returns the bitboard of the line of
+        cells the push moves. Returns 0 if the move is
+        impossible or pushes the player's own marble off
+        of the board. Does not check whether the move
+        reverts the opponent's last move, and does not
+        change the board.
+        """
+        ray, behind, front_edge, lines = DIRECTIONS[direction]
+        blank = self._bits[X]
+
+        # If the cell behind the marble holds a marble, move
+        # is impossible and method returns 0. At the edge
+        # there is no cell behind, so the test always passes.
+        if behind[cell] & ~blank:
+            return 0
+
+        # If there is no blank cell in front of the marble,
+        # the line runs to the edge, and if player is about
+        # to push own marble off of edge, return 0.
+        blanks = ray[cell] & blank
+        if not blanks and self._color_at(front_edge[cell]) == color:
+            return 0
+
+        # Looks up the line, which runs from the marble up
+        # to and including the nearest blank cell or edge.
+        return lines[cell][blanks]
+
+    def _apply_push(self, line, direction):
+        """
+        Takes in the line of cells returned by
+        _check_push and the direction of the push, and
+        pushes the marbles in the line on the board. If
+        a marble is pushed off of the edge, saves its
+        code under the _captured_marble data member.
+        """
+        higher, lower = SHIFTS[direction]
+        self._captured_marble = None  # Assume no marble is captured to begin
+
+        # The far end of the line is either a blank cell
+        # or the marble at the edge, which is pushed off
+        # of the board.
+        if lower:
+            end = (line & -line).bit_length() - 1
         else:
-            self._no_go_move = None
-        return True
+            end = line.bit_length() - 1
+        marble = self._color_at(end)
+        if marble != X:
+            self._captured_marble = marble
+
+        # Updates board
+        self._shift_line(line, higher, lower)
+
+    def _shift_line(self, line, higher, lower):
+        """
+        Takes in a mask of the cells in a line of
+        marbles being pushed and the number of bits
+        each marble moves towards higher or lower
+        bits (one of them is zero). Moves every
+        marble in the line on each marble's bitboard
+        and updates the board position, position
+        history, and legal move counts. A marble
+        moved out of the line is pushed off of the
+        board.
+        """
+        # The pushes of marbles sharing a row or column with
+        # the line may change, so they are counted again.
+        crossing = 0
+        cells = line
+        while cells:
+            low = cells & -cells
+            crossing |= CROSS[low.bit_length() - 1]
+            cells ^= low
+        self._forget_legal(crossing)
+
+        self._position = self._position_after(line, higher, lower)
+        self._history.append(self._position)
+        bits = self._bits
+        for marble in (W, B, R):
+            moved = bits[marble] & line
+            bits[marble] ^= moved ^ ((moved << higher >> lower) & line)
+        # Every cell in the line that is left without a
+        # marble is blank.
+        bits[X] = (bits[X] & ~line) | (line & ~(bits[W] | bits[B] | bits[R]))
+
+        self._count_legal(crossing)
+
+    def _reverts(self, line, direction):
+        """
+        Takes in a line of cells and the direction it is
+        pushed in, and returns True if the push would
+        recreate the board from before the opponent's
+        last move.
+        """
+        higher, lower = SHIFTS[direction]
+        return self._position_after(line, higher, lower) == self._history[0]
+
+    def _count_pushes(self, cell, color):
+        """
+        Takes in the bit number of a cell holding a
+        marble of the given code and returns the number
+        of directions that marble can be pushed in,
+        not counting the rule against reverting the
+        opponent's last move.
+        """
+        count = 0
+        for direction in DIRECTIONS:
+            if self._check_push(cell, color, direction):
+                count += 1
+        return count
+
+    def _forget_legal(self, cells):
+        """
+        Takes in a bitboard of cells and removes the
+        pushes of the white and black marbles in those
+        cells from the legal move counts.
+        """
+        legal_dirs = self._legal_dirs
+        legal_count = self._legal_count
+        for color in (W, B):
+            marbles = self._bits[color] & cells
+            while marbles:
+                low = marbles & -marbles
+                cell = low.bit_length() - 1
+                legal_count[color] -= legal_dirs[cell]
+                legal_dirs[cell] = 0
+                marbles ^= low
+
+    def _count_legal(self, cells):
+        """
+        Takes in a bitboard of cells and adds the pushes
+        of the white and black marbles in those cells to
+        the legal move counts.
+        """
+        legal_dirs = self._legal_dirs
+        legal_count = self._legal_count
+        count_pushes = self._count_pushes
+
+        # A marble that is not on the edge and has no blank
+        # cell next to it has nothing behind it to push from,
+        # which is the usual case inside a group of marbles.
+        # Such marbles keep a count of 0 and are skipped. The
+        # marbles that remain are found for the whole board at
+        # once by shifting the blank cells one step in each
+        # direction.
+        blank = self._bits[X]
+        cells &= (BORDER | (blank >> 1) & ~RIGHT_COLUMN | (blank << 1) & ~LEFT_COLUMN
+                  | blank >> 7 | blank << 7)
+
+        for color in (W, B):
+            marbles = self._bits[color] & cells
+            while marbles:
+                low = marbles & -marbles
+                cell = low.bit_length() - 1
+                pushes = count_pushes(cell, color)
+                legal_dirs[cell] = pushes
+                legal_count[color] += pushes
+                marbles ^= low
+
+    def _can_move(self, color):
+        """
+        Takes in a player's marble code and returns True
+        if the player has a legal move left, reading the
+        legal move count instead of trying every marble.
+        """
+        if self._legal_count[color] == 0:
+            return False
 
-    def update_marbles(self,cell_captured,player):
-        """
-        Takes in as input the color of the captured
-        marble as well as the player who captured
-        the marble. Updates player's marble
-        count and board's marble count.
+        # Every push empties only the pushed cell and changes at
+        # least one other cell in its row or column, so no two
+        # pushes leave the same board. At most one counted push
+        # can revert the opponent's last move.
+        if self._legal_count[color] > 1:
+            return True
+
+        # Only one push is possible. Finds it and checks that it
+        # does not revert the opponent's last move.
+        marbles = self._bits[color]
+        while marbles:
+            low = marbles & -marbles
+            cell = low.bit_length() - 1
+            marbles ^= low
+            if self._legal_dirs[cell]:
+                for direction in DIRECTIONS:
+                    line = self._check_push(cell, color, direction)
+                    if line:
+                        return not self._reverts(line, direction)
+        return False
+
+    def _position_after(self, line, higher, lower):
+        """
+        Takes in the same arguments as _shift_line and
+        returns what the board position would be after
+        the line is pushed, without changing the board.
+        All three bitboards are shifted at once.
+        """
+        lines = line * SPREAD
+        moved = self._position & lines
+        return self._position ^ moved ^ ((moved << higher >> lower) & lines)
+
+    def _color_at(self, cell):
+        """
+        Takes in the bit number of a cell (row * 7 +
+        column) and returns the code of the marble in
+        that cell, W, B, or R, or X if the cell is blank.
+        """
+        for marble in (W, B, R):
+            if self._bits[marble] >> cell & 1:
+                return marble
+        return X
+
+    def update_marbles(self,cell_captured,curr):
+        """
+        Takes in as input the code of the captured
+        marble as well as the index of the player
+        who captured the marble. Updates player's
+        marble count and board's marble count.
         """
         # Captured marble is red.
         # Updates number of red marbles in
         # player's inventory and the board.
-        if cell_captured == 'R':
-            player.add_red()
+        if cell_captured == R:
+            self._red_captured[curr] += 1
             self._red -= 1
         else:
             # Captured marbles is either
@@ -595,8 +692,8 @@ class KubaGame:
             # the player's inventory and
             # the number of white/black
             # marbles on the board.
-            player.add_opponent_marbles()
-            if cell_captured == 'W':
+            self._opp_captured[curr] += 1
+            if cell_captured == W:
                 self._white -= 1
             else:
                 self._black -= 1
@@ -613,9 +710,9 @@ class KubaGame:
         Takes in name of player and returns the
         number of red marbles captured by player.
         """
-        for player in self._players:
-            if player.get_name() == player_name:
-                return player.get_red()
+        curr = self._name_to_index.get(player_name)
+        if curr is not None:
+            return self._red_captured[curr]
 
     def get_marble(self, corr_tup):
         """
@@ -627,7 +724,7 @@ class KubaGame:
         row = corr_tup[0]
         column = corr_tup[1]
 
-        return self._board[row][column]
+        return MARBLE_CHARS[self._color_at(row * 7 + column)]
 
     def get_marble_count(self):
         """
@@ -638,11 +735,14 @@ class KubaGame:
 
     def get_player(self, name):
         """
-        Returns player object.
+        Takes in name of player and returns a
+        KubaPlayer snapshot of the player's name,
+        color, and captured marble counts.
         """
-        for player in self._players:
-            if player.get_name() == name:
-                return player
+        curr = self._name_to_index.get(name)
+        if curr is not None:
+            return KubaPlayer(self._names[curr], MARBLE_CHARS[self._colors[curr]],
+                              self._red_captured[curr], self._opp_captured[curr])
 
 
 if __name__ == '__main__':